@@ -1,55 +1,283 @@
+import bisect
+import html
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
 import streamlit as st
 import pandas as pd
-import uuid
 
 # --- 1. CONFIGURATION ---
 st.set_page_config(layout="wide", page_title="Canteen Stock Tracker")
 
+# Columnar file the inventory is saved to, so it survives app restarts
+INVENTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inventory.parquet")
+INVENTORY_COLUMNS = {'id': 'int64', 'name': 'object', 'quantity': 'int64', 'price': 'float64', 'threshold': 'int64'}
+
+# Number of item rows (and their buttons) rendered per page
+PAGE_SIZE = 25
+
+# Styles injected once per list render. The grid is shared by the header and
+# item rows: [Name (4), Price (2), Threshold (2), Stock (2)]
+LIST_CSS = (
+    "<style>"
+    ".item-grid { display: grid; grid-template-columns: 4fr 2fr 2fr 2fr; align-items: center; }"
+    ".item-row { border: 1px solid #ddd; border-radius: 6px; padding: 6px; }"
+    ".list-header { grid-template-columns: 4fr 2fr 2fr 2fr 4fr; border-bottom: 1px solid #ddd; padding-bottom: 8px; margin-bottom: 8px; }"
+    "</style>"
+)
+
+# List header, pre-built once: the row grid plus an Actions cell over the row buttons
+LIST_HEADER_HTML = (
+    "<div class='item-grid list-header'>"
+    "<em>Item Name</em><em>Price (₱)</em><em>Threshold</em><em>Stock</em><em>Actions</em>"
+    "</div>"
+)
+
 # --- 2. STATE INITIALIZATION ---
 
-# Initialize session state for items and ID counter if not present
+# Initialize session state for items if not present
 if 'canteen_items' not in st.session_state:
     st.session_state['canteen_items'] = []
 
-if 'next_item_id' not in st.session_state:
-    st.session_state['next_item_id'] = 1
+# Maps item id -> Item so lookups don't scan the whole list
+if 'canteen_index' not in st.session_state:
+    st.session_state['canteen_index'] = {}
+
+# Running total kept up to date by the mutation functions
+if 'total_value' not in st.session_state:
+    st.session_state['total_value'] = 0.0
+
+# Id of the item awaiting delete confirmation, if any
+if 'pending_delete' not in st.session_state:
+    st.session_state['pending_delete'] = None
+
+# Feedback set by callbacks, which can't draw elements during a fragment rerun
+if 'status_message' not in st.session_state:
+    st.session_state['status_message'] = None
+
+# Version of the saved inventory this session's items reflect (None until first read)
+if 'inventory_version' not in st.session_state:
+    st.session_state['inventory_version'] = None
 
 # Removed: 'edit_id' initialization
 
 # --- 3. CORE LOGIC FUNCTIONS ---
 
+@dataclass(slots=True)
+class Item:
+    """A stock item. Slots keep per-item memory low and attribute access fast."""
+    id: int
+    name: str
+    quantity: int
+    price: float
+    threshold: int
+    low: bool = field(init=False)
+    price_str: str = field(init=False)
+    row_html: str = field(init=False)
+    widget_keys: dict = field(init=False)
+
+    def __post_init__(self):
+        self.low = self.quantity <= self.threshold
+        self.widget_keys = {k: f"{k}_{self.id}" for k in ('delta', 'apply', 'del', 'confirm', 'cancel')}
+        self.price_str = f"₱{self.price:.2f}"
+        self.row_html = build_row_html(self)
+
+def sort_key(item):
+    """Display order of an item: low stock flag, then name."""
+    return (item.low, item.name)
+
+def insert_sorted(item):
+    """Inserts an item into the list, keeping it in display order."""
+    bisect.insort(st.session_state.canteen_items, item, key=sort_key)
+
+def remove_sorted(item):
+    """Removes an item from the list using a binary search on its sort key."""
+    items = st.session_state.canteen_items
+    i = bisect.bisect_left(items, sort_key(item), key=sort_key)
+    while items[i] is not item:
+        i += 1
+    del items[i]
+
+@st.cache_resource
+def get_inventory_lock():
+    """Returns the lock serializing inventory writes across all sessions of this server."""
+    return threading.Lock()
+
+def inventory_version():
+    """Identifies the saved inventory's current contents; every write replaces the file, changing it."""
+    try:
+        stat = os.stat(INVENTORY_FILE)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+def read_inventory_file():
+    """Reads the saved inventory table, or an empty one if nothing has been saved yet."""
+    if not os.path.exists(INVENTORY_FILE):
+        df = pd.DataFrame(columns=list(INVENTORY_COLUMNS)).astype(INVENTORY_COLUMNS)
+    else:
+        df = pd.read_parquet(INVENTORY_FILE, memory_map=True)
+    # Next id to hand out, saved with the table and never lowered, so deleted ids are not reused.
+    # Files saved before it existed start past their highest id.
+    df.attrs.setdefault('next_id', int(df['id'].max()) + 1 if len(df) else 1)
+    return df
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def load_inventory(version):
+    """Cached read of the saved inventory, keyed by its version so any write invalidates it."""
+    return read_inventory_file()
+
+def update_inventory(apply_change):
+    """Applies one change to the saved inventory under the write lock; returns (result, refreshed)."""
+    with get_inventory_lock():
+        # Re-read inside the lock so changes saved by other sessions are never overwritten.
+        # apply_change gets the fresh table and returns (new_table, result).
+        version = inventory_version()
+        saved = read_inventory_file()
+        df, result = apply_change(saved)
+        df.attrs['next_id'] = max(saved.attrs['next_id'], df.attrs.get('next_id', 0))
+        # Write to a unique temporary file first so a failed write never leaves a truncated inventory
+        tmp = tempfile.NamedTemporaryFile(dir=os.path.dirname(INVENTORY_FILE), prefix="inventory.", suffix=".tmp", delete=False)
+        tmp.close()
+        try:
+            df.to_parquet(tmp.name, index=False)
+            os.replace(tmp.name, INVENTORY_FILE)
+        except BaseException:
+            os.remove(tmp.name)
+            raise
+        new_version = inventory_version()
+    # If another session wrote since this one last read, rebuild from the new table (refreshed);
+    # otherwise the caller applies its own change to the session state
+    refreshed = version != st.session_state.inventory_version
+    if refreshed:
+        set_items(df, new_version)
+    else:
+        st.session_state.inventory_version = new_version
+    return result, refreshed
+
+def load_saved_items():
+    """Rebuilds the session state from the saved inventory if it changed since this session last read it."""
+    version = inventory_version()
+    if version != st.session_state.inventory_version:
+        set_items(load_inventory(version), version)
+
+def set_items(df, version):
+    """Replaces the session's items, index and total with the contents of an inventory table."""
+    items = [
+        Item(id=int(row.id), name=row.name, quantity=int(row.quantity), price=float(row.price), threshold=int(row.threshold))
+        for row in df.itertuples(index=False)
+    ]
+    items.sort(key=sort_key)
+    st.session_state.canteen_items = items
+    st.session_state.canteen_index = {item.id: item for item in items}
+    # Column-wise reduction instead of a per-item loop
+    st.session_state.total_value = round(float((df['quantity'] * df['price']).sum()), 2)
+    st.session_state.inventory_version = version
+
 def add_item(name, quantity, price, threshold):
-    """Adds a new item to the session state."""
-    new_item = {
-        'id': str(uuid.uuid4()), # Use UUID for robust unique IDs
-        'name': name,
-        'quantity': int(quantity),
-        'price': round(float(price), 2),
-        'threshold': int(threshold),
-    }
-    st.session_state.canteen_items.append(new_item)
+    """Adds a new item to the saved inventory and the session state."""
+    quantity, price, threshold = int(quantity), round(float(price), 2), int(threshold)
+
+    def append_row(df):
+        # Ids come from the saved counter so two sessions never hand out the same one
+        new_id = df.attrs['next_id']
+        df.loc[len(df)] = [new_id, name, quantity, price, threshold]
+        df.attrs['next_id'] = new_id + 1
+        return df, new_id
+
+    new_id, refreshed = update_inventory(append_row)
+    if not refreshed:
+        new_item = Item(
+            id=new_id,
+            name=name,
+            quantity=quantity,
+            price=price,
+            threshold=threshold,
+        )
+        insert_sorted(new_item)
+        st.session_state.canteen_index[new_item.id] = new_item
+        st.session_state.total_value = round(st.session_state.total_value + new_item.quantity * new_item.price, 2)
     st.success(f"Added '{name}' to stock!")
 
 def update_quantity(item_id, change):
     """Increments or decrements item quantity."""
-    for item in st.session_state.canteen_items:
-        if item['id'] == item_id:
-            new_quantity = item['quantity'] + change
-            item['quantity'] = max(0, new_quantity)
-            break
+    item = st.session_state.canteen_index.get(item_id)
+    if item and change:
+
+        def change_row(df):
+            rows = df['id'] == item_id
+            if not rows.any():
+                return df, None
+            # Apply the change to the saved quantity, which may include other sessions' updates
+            saved_quantity = max(0, int(df.loc[rows, 'quantity'].iloc[0]) + change)
+            df.loc[rows, 'quantity'] = saved_quantity
+            return df, saved_quantity
+
+        new_quantity, refreshed = update_inventory(change_row)
+        if refreshed:
+            return
+        st.session_state.total_value = round(st.session_state.total_value + (new_quantity - item.quantity) * item.price, 2)
+        is_low = new_quantity <= item.threshold
+        if is_low != item.low:
+            # Crossing the threshold moves the item to the other group
+            remove_sorted(item)
+            item.quantity = new_quantity
+            item.low = is_low
+            insert_sorted(item)
+        else:
+            item.quantity = new_quantity
+        item.row_html = build_row_html(item)
+
+def apply_quantity_change(item_id):
+    """Applies the stock change entered for an item in one step, then resets the input."""
+    delta_key = st.session_state.canteen_index[item_id].widget_keys['delta']
+    update_quantity(item_id, st.session_state[delta_key])
+    st.session_state[delta_key] = 0
 
 def delete_item(item_id):
-    """Deletes an item from the session state."""
-    st.session_state.canteen_items = [item for item in st.session_state.canteen_items if item['id'] != item_id]
-    st.success("Item deleted successfully.")
+    """Deletes an item from the saved inventory and the session state."""
+    item = st.session_state.canteen_index.get(item_id)
+    if item:
+        _, refreshed = update_inventory(lambda df: (df[df['id'] != item_id], None))
+        if not refreshed:
+            del st.session_state.canteen_index[item_id]
+            remove_sorted(item)
+            st.session_state.total_value = round(st.session_state.total_value - item.quantity * item.price, 2)
+    st.session_state.pending_delete = None
+    st.session_state.status_message = "Item deleted successfully."
+
+def request_delete(item_id):
+    """Marks an item as awaiting delete confirmation; only one can be pending at a time."""
+    st.session_state.pending_delete = item_id
+
+def cancel_delete():
+    """Dismisses the pending delete confirmation."""
+    st.session_state.pending_delete = None
 
 # Removed: set_edit_mode function
 # Removed: cancel_edit function
 
+def change_page(step):
+    """Moves the inventory list back or forward by the given number of pages."""
+    st.session_state.page = st.session_state.get('page', 1) + step
+
+def build_row_html(item):
+    """Builds the HTML for an item's display cells; cached on the item as row_html."""
+    prefix = "🚨 " if item.low else ""
+    color = 'red' if item.low else 'green'
+    return (
+        f"<div class='item-grid item-row'>"
+        f"<span><em>{prefix}{html.escape(item.name)}</em></span>"
+        f"<span>{item.price_str}</span>"
+        f"<span>{item.threshold}</span>"
+        f"<span style='font-size: 1.5rem; font-weight: bold; color: {color};'>{item.quantity}</span>"
+        f"</div>"
+    )
+
 def calculate_total_value():
-    """Calculates the total monetary value of all items in stock."""
-    total_value = sum(item['quantity'] * item['price'] for item in st.session_state.canteen_items)
-    return total_value
+    """Returns the total monetary value of all items in stock."""
+    return st.session_state.total_value
 
 # --- 4. UI COMPONENTS ---
 
@@ -71,7 +299,6 @@ def render_add_item_form():
         if submitted:
             if name and quantity >= 0 and price >= 0 and threshold >= 1:
                 add_item(name, quantity, price, threshold)
-                st.session_state.next_item_id += 1 
             else:
                 st.error("Please ensure all fields are valid: Name is not empty, Quantity/Price ≥ 0, Threshold ≥ 1.")
 
@@ -85,80 +312,63 @@ def render_inventory_list():
         st.info("No items in stock. Add your first item using the form on the left!")
         return
 
-    # Sort items: Low stock first, then by name
-    sorted_items = sorted(st.session_state.canteen_items, 
-                         key=lambda x: (x['quantity'] <= x['threshold'], x['name']))
-
-    # Adjusted columns: [Name (4), Price (2), Threshold (2), Stock (2), Actions (3)]
-    header_cols = st.columns([4, 2, 2, 2, 3])
-    header_cols[0].markdown("*Item Name*")
-    header_cols[1].markdown("*Price (₱)*")
-    header_cols[2].markdown("*Threshold*")
-    header_cols[3].markdown("*Stock*")
-    header_cols[4].markdown("*Actions*")
-    st.divider()
-
-    for item in sorted_items:
-        is_low_stock = item['quantity'] <= item['threshold']
-        
-        # Streamlit containers for styling
-        with st.container(border=True):
-            # Adjusted columns for item rows
-            col_name, col_price, col_threshold, col_quantity, col_actions = st.columns([4, 2, 2, 2, 3])
-
-            with col_name:
-                prefix = "🚨 " if is_low_stock else ""
-                st.markdown(f"*{prefix}{item['name']}*")
-
-            with col_price:
-                st.markdown(f"₱{item['price']:.2f}")
-
-            with col_threshold:
-                st.markdown(f"{item['threshold']}")
-
-            with col_quantity:
-                st.markdown(f"<p style='font-size: 1.5rem; font-weight: bold; color: {'red' if is_low_stock else 'green'};'>{item['quantity']}</p>", unsafe_allow_html=True)
-            
-            with col_actions:
-                # Use a smaller column layout for the 3 remaining buttons (+, -, Del)
-                btn_col1, btn_col2, btn_col3 = st.columns(3) 
-                
-                # Decrement button
-                with btn_col1:
-                    st.button("➖", key=f"dec_{item['id']}", on_click=update_quantity, args=(item['id'], -1), help="Decrement stock")
-                
-                # Increment button
-                with btn_col2:
-                    st.button("➕", key=f"inc_{item['id']}", on_click=update_quantity, args=(item['id'], 1), help="Increment stock")
-                
-                # Delete button with confirmation
-                with btn_col3:
-                    if st.button("🗑️", key=f"del_{item['id']}", help="Delete item"):
-                        # Streamlit confirmation: use a temporary session state variable
-                        st.session_state[f'confirm_delete_{item["id"]}'] = True
-                
-                # Deletion Confirmation Logic
-                if st.session_state.get(f'confirm_delete_{item["id"]}'):
-                    st.warning(f"Confirm deletion of *{item['name']}*?", icon="⚠️")
-                    confirm_col1, confirm_col2 = st.columns(2)
-                    with confirm_col1:
-                        st.button("Yes, Delete", key=f"confirm_{item['id']}", on_click=delete_item, args=(item['id'],), type="primary")
-                    with confirm_col2:
-                        st.button("Cancel", key=f"cancel_{item['id']}", on_click=lambda: st.session_state.pop(f'confirm_delete_{item["id"]}'), type="secondary")
-                        st.stop() # Stop execution to wait for confirmation
+    # Only the current page gets widgets, so reruns stay cheap for large inventories
+    items = st.session_state.canteen_items
+    total_pages = -(-len(items) // PAGE_SIZE)
+    page = 1
+    if total_pages > 1:
+        st.session_state['page'] = min(st.session_state.get('page', 1), total_pages)
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            st.button("◀ Prev", key="prev_page", on_click=change_page, args=(-1,), disabled=st.session_state.page <= 1)
+        with page_col:
+            page = st.number_input("Page", min_value=1, max_value=total_pages, step=1, key='page', label_visibility="collapsed")
+        with next_col:
+            st.button("Next ▶", key="next_page", on_click=change_page, args=(1,), disabled=st.session_state.page >= total_pages)
+    start = (page - 1) * PAGE_SIZE
 
-# --- 5. MAIN APP EXECUTION ---
+    # Styles and header go out as a single element
+    st.markdown(LIST_CSS + LIST_HEADER_HTML, unsafe_allow_html=True)
 
-st.title("🧺 Canteen Item Tracker")
+    # Items are kept in display order by insert_sorted, no need to sort here
+    for item in items[start:start + PAGE_SIZE]:
+        # One flat column split per row: [Item details (10), Δ (2), Apply (1), Del (1)]
+        col_details, col_delta, col_apply, col_delete = st.columns([10, 2, 1, 1], vertical_alignment="center")
 
-# Create the two main columns for the layout
-col_form, col_list = st.columns([1, 2], gap="large")
+        with col_details:
+            st.markdown(item.row_html, unsafe_allow_html=True)
 
-with col_form:
-    # Removed conditional check for edit_id
-    render_add_item_form() 
+        # Stock change, so a bulk adjustment is one rerun instead of one per unit
+        with col_delta:
+            st.number_input("Stock change", step=1, key=item.widget_keys['delta'], label_visibility="collapsed")
+
+        # Apply button
+        with col_apply:
+            st.button("✔️", key=item.widget_keys['apply'], on_click=apply_quantity_change, args=(item.id,), help="Apply stock change")
+
+        # Delete button with confirmation
+        with col_delete:
+            st.button("🗑️", key=item.widget_keys['del'], on_click=request_delete, args=(item.id,), help="Delete item")
+
+        # Deletion Confirmation Logic, shown under the pending item only
+        if st.session_state.pending_delete == item.id:
+            st.warning(f"Confirm deletion of *{item.name}*?", icon="⚠️")
+            confirm_col1, confirm_col2 = st.columns(2)
+            with confirm_col1:
+                st.button("Yes, Delete", key=item.widget_keys['confirm'], on_click=delete_item, args=(item.id,), type="primary")
+            with confirm_col2:
+                st.button("Cancel", key=item.widget_keys['cancel'], on_click=cancel_delete, type="secondary")
+
+@st.fragment
+def render_inventory_panel():
+    """Renders the total value and inventory list. As a fragment, list actions rerun only this panel."""
+    # Pick up changes saved by other sessions
+    load_saved_items()
+
+    if st.session_state.status_message:
+        st.success(st.session_state.status_message)
+        st.session_state.status_message = None
 
-with col_list:
     total_value = calculate_total_value()
     
     # Display Total Item Value
@@ -174,3 +384,17 @@ with col_list:
 
     st.markdown("---")
     render_inventory_list()
+
+# --- 5. MAIN APP EXECUTION ---
+
+st.title("🧺 Canteen Item Tracker")
+
+# Create the two main columns for the layout
+col_form, col_list = st.columns([1, 2], gap="large")
+
+with col_form:
+    # Removed conditional check for edit_id
+    render_add_item_form() 
+
+with col_list:
+    render_inventory_panel()